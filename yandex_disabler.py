@@ -1,22 +1,34 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
+import queue
+import functools
 import logging
 import subprocess
 import sys
 import os
+import re
 import ctypes
+from ctypes import wintypes
 import winreg
-from typing import Optional, Callable, List, Dict, Tuple
+from typing import Optional, Callable, List, Dict, Tuple, Iterator
 from dataclasses import dataclass, field
 from contextlib import contextmanager
 import json
+import marshal
 from pathlib import Path
 
+try:
+    import psutil
+except ImportError:
+    psutil = None  # Нужен только для проверки командной строки browser.exe
+
 # Константы
 __version__ = "1.0"
 APP_NAME = "YandexBrowserBlocker"
 CONFIG_FILE = Path(os.getenv('APPDATA', '.')) / APP_NAME / "config.json"
+# Быстрая копия config.json: marshal((mtime_ns, dict))
+CONFIG_CACHE_FILE = CONFIG_FILE.with_name(".config.cache")
 
 # Пути для блокировки в реестре IFEO
 IFEO_PATH = r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Image File Execution Options"
@@ -30,6 +42,35 @@ BLOCKED_EXECUTABLES = [
     "ya.exe",
 ]
 
+# Допустимые имена исполняемых файлов
+_EXE_NAME_RE = re.compile(r'^[\w\-\.]+\.exe$', re.IGNORECASE)
+_VALID_BUILTIN_SET = frozenset(BLOCKED_EXECUTABLES)
+
+# Производные наборы для поиска процессов (вычисляются один раз)
+_BLOCKED_EXE_SET = frozenset(exe.lower() for exe in BLOCKED_EXECUTABLES)
+# Имена, которые однозначно принадлежат Яндекс Браузеру.
+# browser.exe сюда не входит: это имя используют и другие программы
+_YANDEX_NAMES = _BLOCKED_EXE_SET - {"browser.exe"}
+_TASKKILL_ARGS = ('taskkill', '/F') + tuple(
+    arg for exe in BLOCKED_EXECUTABLES for arg in ('/IM', exe)
+)
+_TASKKILL_NAME_RE = re.compile(r'"([^"]+)"')
+
+# Коды Win32
+ERROR_SUCCESS = 0
+ERROR_FILE_NOT_FOUND = 2
+ERROR_MORE_DATA = 234
+ERROR_NO_MORE_ITEMS = 259
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+MAX_PATH = 260
+TH32CS_SNAPPROCESS = 0x00000002
+PROCESS_TERMINATE = 0x0001
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+REG_NOTIFY_CHANGE_NAME = 0x00000001
+REG_NOTIFY_CHANGE_LAST_SET = 0x00000004
+WAIT_OBJECT_0 = 0
+INFINITE = 0xFFFFFFFF
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO,
@@ -38,6 +79,18 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _compute_is_admin() -> bool:
+    """Запрашивает у Windows, запущен ли процесс с правами администратора"""
+    try:
+        return ctypes.windll.shell32.IsUserAnAdmin() != 0
+    except Exception:
+        return False
+
+
+# Права не меняются за время жизни процесса - проверяем один раз
+_IS_ADMIN = _compute_is_admin()
+
+
 @dataclass
 class AppConfig:
     """Конфигурация приложения"""
@@ -46,32 +99,73 @@ class AppConfig:
     blocked_executables: List[str] = field(default_factory=lambda: BLOCKED_EXECUTABLES.copy())
     
     def save(self):
+        data = {
+            'show_notifications': self.show_notifications,
+            'minimize_to_tray': self.minimize_to_tray,
+            'blocked_executables': self.blocked_executables,
+        }
         try:
             CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'show_notifications': self.show_notifications,
-                    'minimize_to_tray': self.minimize_to_tray,
-                    'blocked_executables': self.blocked_executables,
-                }, f, indent=2)
+            _atomic_write(CONFIG_FILE, json.dumps(data, indent=2).encode('utf-8'))
+            self._write_cache(CONFIG_FILE.stat().st_mtime_ns, data)
         except Exception as e:
-            logger.error(f"Ошибка сохранения конфигурации: {e}")
+            logger.error("Ошибка сохранения конфигурации: %s", e)
+    
+    @staticmethod
+    def _write_cache(mtime_ns: int, data: dict):
+        """Сохраняет разобранный config.json рядом с ним в формате marshal"""
+        try:
+            _atomic_write(CONFIG_CACHE_FILE, marshal.dumps((mtime_ns, data)))
+        except OSError as e:
+            logger.debug("Не удалось записать кэш конфигурации: %s", e)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _read_config_file(mtime_ns: int) -> dict:
+        """
+        Читает config.json; результат кэшируется по времени изменения файла.
+        
+        Если кэш marshal записан для того же mtime, JSON не разбирается.
+        """
+        try:
+            with open(CONFIG_CACHE_FILE, 'rb') as f:
+                cached_mtime_ns, data = marshal.load(f)
+            if cached_mtime_ns == mtime_ns and isinstance(data, dict):
+                return data
+        except (OSError, EOFError, ValueError, TypeError):
+            pass  # Кэша нет или он повреждён
+        
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        AppConfig._write_cache(mtime_ns, data)
+        return data
     
     @classmethod
     def load(cls) -> 'AppConfig':
         config = cls()
         try:
-            if CONFIG_FILE.exists():
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+            try:
+                mtime_ns = CONFIG_FILE.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime_ns = 0
+            if mtime_ns:
+                data = cls._read_config_file(mtime_ns)
                 config.show_notifications = data.get('show_notifications', True)
                 config.minimize_to_tray = data.get('minimize_to_tray', True)
-                config.blocked_executables = data.get('blocked_executables', BLOCKED_EXECUTABLES.copy())
+                config.blocked_executables = list(data.get('blocked_executables', BLOCKED_EXECUTABLES))
         except Exception as e:
-            logger.error(f"Ошибка загрузки конфигурации: {e}")
+            logger.error("Ошибка загрузки конфигурации: %s", e)
         return config
 
 
+def _atomic_write(path: Path, data: bytes):
+    """Записывает файл целиком через временный файл и os.replace"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
 @contextmanager
 def temp_tk_root():
     """Контекстный менеджер для временного окна Tk"""
@@ -85,10 +179,7 @@ def temp_tk_root():
 
 def is_admin() -> bool:
     """Проверяет права администратора"""
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin() != 0
-    except Exception:
-        return False
+    return _IS_ADMIN
 
 
 def run_as_admin() -> bool:
@@ -108,10 +199,299 @@ def run_as_admin() -> bool:
         )
         return ret > 32
     except Exception as e:
-        logger.error(f"Ошибка при запросе прав: {e}")
+        logger.error("Ошибка при запросе прав: %s", e)
         return False
 
 
+def _ifeo_key_location(exe_name: str,
+                       parent: Optional[winreg.HKEYType] = None) -> Tuple[object, str]:
+    """
+    Возвращает (корневой ключ, подключ) для IFEO-записи файла.
+    
+    Если ключ IFEO уже открыт, подключ указывается только именем файла.
+    """
+    if parent is not None:
+        return parent, exe_name
+    return winreg.HKEY_LOCAL_MACHINE, f"{IFEO_PATH}\\{exe_name}"
+
+
+class PROCESSENTRY32W(ctypes.Structure):
+    """Запись о процессе из снимка Toolhelp"""
+    _fields_ = [
+        ('dwSize', wintypes.DWORD),
+        ('cntUsage', wintypes.DWORD),
+        ('th32ProcessID', wintypes.DWORD),
+        ('th32DefaultHeapID', ctypes.c_size_t),
+        ('th32ModuleID', wintypes.DWORD),
+        ('cntThreads', wintypes.DWORD),
+        ('th32ParentProcessID', wintypes.DWORD),
+        ('pcPriClassBase', wintypes.LONG),
+        ('dwFlags', wintypes.DWORD),
+        ('szExeFile', wintypes.WCHAR * MAX_PATH),
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_kernel32():
+    """Загружает kernel32 с прототипами всех используемых функций"""
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    kernel32.CloseHandle.restype = wintypes.BOOL
+    
+    # Процессы
+    kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    kernel32.Process32FirstW.restype = wintypes.BOOL
+    kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    kernel32.Process32NextW.restype = wintypes.BOOL
+    kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.TerminateProcess.argtypes = [wintypes.HANDLE, wintypes.UINT]
+    kernel32.TerminateProcess.restype = wintypes.BOOL
+    kernel32.QueryFullProcessImageNameW.argtypes = [
+        wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, wintypes.PDWORD,
+    ]
+    kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+    
+    # События
+    kernel32.CreateEventW.argtypes = [
+        wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR,
+    ]
+    kernel32.CreateEventW.restype = wintypes.HANDLE
+    kernel32.SetEvent.argtypes = [wintypes.HANDLE]
+    kernel32.SetEvent.restype = wintypes.BOOL
+    kernel32.WaitForMultipleObjects.argtypes = [
+        wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD,
+    ]
+    kernel32.WaitForMultipleObjects.restype = wintypes.DWORD
+    
+    return kernel32
+
+
+class _RegistryTransaction:
+    """
+    Транзакция реестра Windows (Kernel Transaction Manager).
+    
+    Все изменения внутри транзакции применяются одним коммитом.
+    Если транзакции недоступны (до Windows Vista), конструктор выбрасывает OSError.
+    """
+    
+    _ktmw32 = None
+    _advapi32 = None
+    
+    def __init__(self):
+        self._load_api()
+        self.handle = self._ktmw32.CreateTransaction(None, None, 0, 0, 0, 0, None)
+        if not self.handle or self.handle == INVALID_HANDLE_VALUE:
+            self.handle = None
+            raise ctypes.WinError(ctypes.get_last_error())
+    
+    @classmethod
+    def _load_api(cls):
+        """Загружает функции KTM и транзакционного реестра"""
+        if cls._advapi32 is not None:
+            return
+        
+        ktmw32 = ctypes.WinDLL('ktmw32', use_last_error=True)
+        advapi32 = ctypes.WinDLL('advapi32', use_last_error=True)
+        
+        ktmw32.CreateTransaction.argtypes = [
+            wintypes.LPVOID, wintypes.LPVOID, wintypes.DWORD, wintypes.DWORD,
+            wintypes.DWORD, wintypes.DWORD, wintypes.LPWSTR,
+        ]
+        ktmw32.CreateTransaction.restype = wintypes.HANDLE
+        ktmw32.CommitTransaction.argtypes = [wintypes.HANDLE]
+        ktmw32.CommitTransaction.restype = wintypes.BOOL
+        
+        advapi32.RegCreateKeyTransactedW.argtypes = [
+            wintypes.HKEY, wintypes.LPCWSTR, wintypes.DWORD, wintypes.LPWSTR,
+            wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+            ctypes.POINTER(wintypes.HKEY), wintypes.LPDWORD,
+            wintypes.HANDLE, wintypes.LPVOID,
+        ]
+        advapi32.RegCreateKeyTransactedW.restype = wintypes.LONG
+        advapi32.RegSetValueExW.argtypes = [
+            wintypes.HKEY, wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD,
+            wintypes.LPCVOID, wintypes.DWORD,
+        ]
+        advapi32.RegSetValueExW.restype = wintypes.LONG
+        advapi32.RegDeleteKeyTransactedW.argtypes = [
+            wintypes.HKEY, wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD,
+            wintypes.HANDLE, wintypes.LPVOID,
+        ]
+        advapi32.RegDeleteKeyTransactedW.restype = wintypes.LONG
+        advapi32.RegCloseKey.argtypes = [wintypes.HKEY]
+        advapi32.RegCloseKey.restype = wintypes.LONG
+        
+        cls._ktmw32, cls._advapi32 = ktmw32, advapi32
+    
+    @staticmethod
+    def _check(status: int):
+        """Преобразует код ошибки реестра в исключение"""
+        if status != ERROR_SUCCESS:
+            raise ctypes.WinError(status)
+    
+    def create_key(self, root: int, sub_key: str, access: int) -> wintypes.HKEY:
+        """Создаёт или открывает подключ root в рамках транзакции"""
+        key = wintypes.HKEY()
+        self._check(self._advapi32.RegCreateKeyTransactedW(
+            root, sub_key, 0, None, 0, access, None,
+            ctypes.byref(key), None, self.handle, None
+        ))
+        return key
+    
+    def set_string(self, key: wintypes.HKEY, name: str, value: str):
+        """Записывает строковое значение REG_SZ"""
+        data = ctypes.create_unicode_buffer(value)
+        self._check(self._advapi32.RegSetValueExW(
+            key, name, 0, winreg.REG_SZ, data, ctypes.sizeof(data)
+        ))
+    
+    def close_key(self, key: wintypes.HKEY):
+        """Закрывает ключ, открытый в транзакции"""
+        self._advapi32.RegCloseKey(key)
+    
+    def delete_key(self, root: int, sub_key: str, view: int):
+        """Удаляет подключ root (вместе со значениями) в рамках транзакции"""
+        self._check(self._advapi32.RegDeleteKeyTransactedW(
+            root, sub_key, view, 0, self.handle, None
+        ))
+    
+    def commit(self):
+        """Фиксирует все изменения одним коммитом"""
+        if not self._ktmw32.CommitTransaction(self.handle):
+            raise ctypes.WinError(ctypes.get_last_error())
+    
+    def close(self):
+        """Закрывает транзакцию (незафиксированные изменения откатываются)"""
+        if self.handle:
+            _load_kernel32().CloseHandle(self.handle)
+            self.handle = None
+    
+    def __enter__(self) -> '_RegistryTransaction':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _RawRegistry:
+    """
+    Прямой доступ к advapi32 для чтения IFEO без обёрток winreg.
+    
+    Используется в проверке статуса, которая выполняется при каждом обновлении.
+    """
+    
+    _advapi32 = None
+    
+    @classmethod
+    def _load_api(cls):
+        """Загружает функции чтения реестра"""
+        if cls._advapi32 is not None:
+            return cls._advapi32
+        
+        advapi32 = ctypes.WinDLL('advapi32', use_last_error=True)
+        
+        advapi32.RegOpenKeyExW.argtypes = [
+            wintypes.HKEY, wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD,
+            ctypes.POINTER(wintypes.HKEY),
+        ]
+        advapi32.RegOpenKeyExW.restype = wintypes.LONG
+        advapi32.RegQueryValueExW.argtypes = [
+            wintypes.HKEY, wintypes.LPCWSTR, wintypes.LPDWORD, wintypes.LPDWORD,
+            wintypes.LPVOID, wintypes.LPDWORD,
+        ]
+        advapi32.RegQueryValueExW.restype = wintypes.LONG
+        advapi32.RegQueryInfoKeyW.argtypes = [
+            wintypes.HKEY, wintypes.LPWSTR, wintypes.LPDWORD, wintypes.LPDWORD,
+            wintypes.LPDWORD, wintypes.LPDWORD, wintypes.LPDWORD, wintypes.LPDWORD,
+            wintypes.LPDWORD, wintypes.LPDWORD, wintypes.LPDWORD, wintypes.LPVOID,
+        ]
+        advapi32.RegQueryInfoKeyW.restype = wintypes.LONG
+        advapi32.RegCloseKey.argtypes = [wintypes.HKEY]
+        advapi32.RegCloseKey.restype = wintypes.LONG
+        
+        cls._advapi32 = advapi32
+        return advapi32
+    
+    @classmethod
+    def _open_key(cls, exe_name: str, access: int,
+                  parent: Optional[winreg.HKEYType] = None) -> Optional[wintypes.HKEY]:
+        """Открывает ключ IFEO файла; возвращает None, если ключа нет"""
+        root, sub_key = _ifeo_key_location(exe_name, parent)
+        key = wintypes.HKEY()
+        status = cls._load_api().RegOpenKeyExW(int(root), sub_key, 0, access, ctypes.byref(key))
+        if status == ERROR_FILE_NOT_FOUND:
+            return None
+        if status != ERROR_SUCCESS:
+            raise ctypes.WinError(status)
+        return key
+    
+    @classmethod
+    def _read_debugger(cls, key: wintypes.HKEY) -> Optional[str]:
+        """Читает строковое значение Debugger из открытого ключа"""
+        buffer = ctypes.create_unicode_buffer(MAX_PATH)
+        size = wintypes.DWORD(ctypes.sizeof(buffer))
+        value_type = wintypes.DWORD()
+        status = cls._load_api().RegQueryValueExW(
+            key, "Debugger", None, ctypes.byref(value_type), buffer, ctypes.byref(size)
+        )
+        
+        if status in (ERROR_FILE_NOT_FOUND, ERROR_MORE_DATA):
+            return None
+        if status != ERROR_SUCCESS:
+            raise ctypes.WinError(status)
+        if value_type.value not in (winreg.REG_SZ, winreg.REG_EXPAND_SZ):
+            return None
+        return buffer.value
+    
+    @classmethod
+    def query_debugger(cls, exe_name: str, access: int,
+                       parent: Optional[winreg.HKEYType] = None) -> Optional[str]:
+        """
+        Читает значение Debugger из IFEO для указанного файла.
+        
+        parent - уже открытый ключ IFEO (если есть), тогда путь берётся относительно него.
+        Возвращает None, если ключа или строкового значения нет
+        (или оно длиннее MAX_PATH - такое значение точно не наше).
+        """
+        key = cls._open_key(exe_name, access, parent)
+        if key is None:
+            return None
+        try:
+            return cls._read_debugger(key)
+        finally:
+            cls._load_api().RegCloseKey(key)
+    
+    @classmethod
+    def query_key_info(cls, exe_name: str, access: int,
+                       parent: Optional[winreg.HKEYType] = None
+                       ) -> Tuple[Optional[str], int, int]:
+        """
+        Читает через один открытый ключ IFEO (Debugger, число подключей, число значений).
+        
+        Если ключа нет, возвращает (None, 0, 0).
+        """
+        advapi32 = cls._load_api()
+        key = cls._open_key(exe_name, access, parent)
+        if key is None:
+            return None, 0, 0
+        try:
+            subkey_count = wintypes.DWORD()
+            value_count = wintypes.DWORD()
+            status = advapi32.RegQueryInfoKeyW(
+                key, None, None, None, ctypes.byref(subkey_count), None, None,
+                ctypes.byref(value_count), None, None, None, None
+            )
+            if status != ERROR_SUCCESS:
+                raise ctypes.WinError(status)
+            return cls._read_debugger(key), subkey_count.value, value_count.value
+        finally:
+            advapi32.RegCloseKey(key)
+
+
 class RegistryBlocker:
     """
     Блокировка через реестр Windows (Image File Execution Options).
@@ -123,6 +503,9 @@ class RegistryBlocker:
     # Команда-заглушка, которая ничего не делает
     BLOCKER_CMD = "nul"
     
+    # Кэш статуса блокировки: имя файла в нижнем регистре -> заблокирован ли
+    _status_cache: Dict[str, bool] = {}
+    
     @classmethod
     def _get_registry_access(cls, write: bool = False) -> int:
         """Получает флаги доступа к реестру"""
@@ -132,28 +515,57 @@ class RegistryBlocker:
             access |= winreg.KEY_WOW64_64KEY
         return access
     
+    @classmethod
+    def invalidate_cache(cls, exe_name: Optional[str] = None):
+        """Сбрасывает кэш статуса для одного файла или для всех"""
+        if exe_name is None:
+            cls._status_cache.clear()
+        else:
+            cls._status_cache.pop(exe_name.lower(), None)
+    
+    @classmethod
+    def _open_ifeo(cls, write: bool = True) -> winreg.HKEYType:
+        """Открывает родительский ключ IFEO, чтобы работать с подключами по имени"""
+        return winreg.OpenKey(
+            winreg.HKEY_LOCAL_MACHINE,
+            IFEO_PATH,
+            0,
+            cls._get_registry_access(write=write)
+        )
+    
+    @classmethod
+    def _open_ifeo_or_none(cls, write: bool = True) -> Optional[winreg.HKEYType]:
+        """Как _open_ifeo, но при ошибке возвращает None (тогда пути берутся от HKLM)"""
+        try:
+            return cls._open_ifeo(write=write)
+        except OSError as e:
+            logger.debug("Не удалось открыть IFEO: %s", e)
+            return None
+    
     @classmethod
     def _validate_exe_name(cls, exe_name: str) -> bool:
         """Валидация имени исполняемого файла"""
-        import re
-        return bool(re.match(r'^[\w\-\.]+\.exe$', exe_name, re.IGNORECASE))
+        if exe_name in _VALID_BUILTIN_SET:
+            return True
+        return bool(_EXE_NAME_RE.match(exe_name))
     
     @classmethod
-    def block_executable(cls, exe_name: str) -> Tuple[bool, str]:
+    def block_executable(cls, exe_name: str, parent: Optional[winreg.HKEYType] = None) -> Tuple[bool, str]:
         """
         Блокирует запуск указанного исполняемого файла.
         
         Создаёт ключ в IFEO с Debugger=nul, что предотвращает запуск.
+        parent - уже открытый ключ IFEO (см. _open_ifeo).
         """
         if not cls._validate_exe_name(exe_name):
             return False, f"Недопустимое имя: {exe_name}"
         
-        key_path = f"{IFEO_PATH}\\{exe_name}"
+        root, key_path = _ifeo_key_location(exe_name, parent)
         
         try:
             # Создаём или открываем ключ
             key = winreg.CreateKeyEx(
-                winreg.HKEY_LOCAL_MACHINE,
+                root,
                 key_path,
                 0,
                 cls._get_registry_access(write=True)
@@ -162,128 +574,381 @@ class RegistryBlocker:
             try:
                 # Устанавливаем Debugger на nul - это блокирует запуск
                 winreg.SetValueEx(key, "Debugger", 0, winreg.REG_SZ, cls.BLOCKER_CMD)
-                logger.info(f"✅ Заблокирован: {exe_name}")
+                cls.invalidate_cache(exe_name)
+                logger.info("✅ Заблокирован: %s", exe_name)
                 return True, f"Заблокирован: {exe_name}"
             finally:
                 winreg.CloseKey(key)
                 
         except PermissionError:
             msg = f"Нет прав администратора для блокировки: {exe_name}"
-            logger.error(f"❌ {msg}")
+            logger.error("❌ %s", msg)
             return False, msg
         except Exception as e:
             msg = f"Ошибка блокировки {exe_name}: {e}"
-            logger.error(f"❌ {msg}")
+            logger.error("❌ %s", msg)
             return False, msg
     
     @classmethod
-    def unblock_executable(cls, exe_name: str) -> Tuple[bool, str]:
+    def unblock_executable(cls, exe_name: str, parent: Optional[winreg.HKEYType] = None) -> Tuple[bool, str]:
         """
         Разблокирует запуск указанного исполняемого файла.
         
-        Удаляет ключ Debugger из IFEO.
+        Удаляет значение Debugger из IFEO, только если это наш Debugger=nul.
+        Сам ключ удаляется, только если в нём не осталось значений и подключей.
+        parent - уже открытый ключ IFEO (см. _open_ifeo).
         """
         if not cls._validate_exe_name(exe_name):
             return False, f"Недопустимое имя: {exe_name}"
         
-        key_path = f"{IFEO_PATH}\\{exe_name}"
+        root, key_path = _ifeo_key_location(exe_name, parent)
         
         try:
-            # Пробуем открыть и удалить значение Debugger
+            # Пробуем открыть ключ и удалить наше значение Debugger
             try:
                 key = winreg.OpenKey(
-                    winreg.HKEY_LOCAL_MACHINE,
+                    root,
                     key_path,
                     0,
                     cls._get_registry_access(write=True)
                 )
+            except FileNotFoundError:
+                key = None  # Ключа уже нет
+            
+            if key is not None:
                 try:
-                    winreg.DeleteValue(key, "Debugger")
-                except FileNotFoundError:
-                    pass  # Значения уже нет
+                    try:
+                        debugger, _ = winreg.QueryValueEx(key, "Debugger")
+                    except FileNotFoundError:
+                        debugger = None  # Значения уже нет
+                    if debugger == cls.BLOCKER_CMD:
+                        # Чужой Debugger (настоящий отладчик, другая программа) не трогаем
+                        winreg.DeleteValue(key, "Debugger")
+                    subkey_count, value_count, _ = winreg.QueryInfoKey(key)
                 finally:
                     winreg.CloseKey(key)
-            except FileNotFoundError:
-                pass  # Ключа уже нет
-            
-            # Пробуем удалить сам ключ (если он пустой)
-            try:
-                winreg.DeleteKey(winreg.HKEY_LOCAL_MACHINE, key_path)
-            except (FileNotFoundError, OSError):
-                pass  # Ключа нет или он не пустой
+                
+                # DeleteKey удаляет ключ вместе со значениями - только если он пустой
+                if subkey_count == 0 and value_count == 0:
+                    try:
+                        winreg.DeleteKey(root, key_path)
+                    except OSError:
+                        pass  # Ключ уже удалён или в нём появились подключи
             
-            logger.info(f"✅ Разблокирован: {exe_name}")
+            cls.invalidate_cache(exe_name)
+            logger.info("✅ Разблокирован: %s", exe_name)
             return True, f"Разблокирован: {exe_name}"
             
         except PermissionError:
             msg = f"Нет прав администратора для разблокировки: {exe_name}"
-            logger.error(f"❌ {msg}")
+            logger.error("❌ %s", msg)
             return False, msg
         except Exception as e:
             msg = f"Ошибка разблокировки {exe_name}: {e}"
-            logger.error(f"❌ {msg}")
+            logger.error("❌ %s", msg)
             return False, msg
     
     @classmethod
-    def is_blocked(cls, exe_name: str) -> bool:
-        """Проверяет, заблокирован ли исполняемый файл"""
+    def is_blocked(cls, exe_name: str, parent: Optional[winreg.HKEYType] = None) -> bool:
+        """
+        Проверяет, заблокирован ли исполняемый файл (с кэшированием).
+        
+        parent - уже открытый ключ IFEO (см. _open_ifeo).
+        """
+        cache_key = exe_name.lower()
+        try:
+            return cls._status_cache[cache_key]
+        except KeyError:
+            pass
+        
+        blocked = cls._is_blocked_uncached(exe_name, parent)
+        cls._status_cache[cache_key] = blocked
+        return blocked
+    
+    @classmethod
+    def _is_blocked_uncached(cls, exe_name: str, parent: Optional[winreg.HKEYType] = None) -> bool:
+        """Читает статус блокировки напрямую из реестра"""
         if not cls._validate_exe_name(exe_name):
             return False
         
-        key_path = f"{IFEO_PATH}\\{exe_name}"
-        
         try:
-            key = winreg.OpenKey(
-                winreg.HKEY_LOCAL_MACHINE,
-                key_path,
-                0,
-                cls._get_registry_access(write=False)
+            value = _RawRegistry.query_debugger(
+                exe_name, cls._get_registry_access(write=False), parent
             )
-            try:
-                value, _ = winreg.QueryValueEx(key, "Debugger")
-                return value == cls.BLOCKER_CMD
-            except FileNotFoundError:
-                return False
-            finally:
-                winreg.CloseKey(key)
-        except FileNotFoundError:
-            return False
+            return value == cls.BLOCKER_CMD
         except Exception as e:
-            logger.debug(f"Ошибка проверки {exe_name}: {e}")
+            logger.debug("Ошибка проверки %s: %s", exe_name, e)
             return False
     
     @classmethod
-    def block_all(cls, executables: List[str]) -> Tuple[bool, List[str]]:
-        """Блокирует все указанные исполняемые файлы"""
+    def block_all_batched(cls, executables: List[str],
+                          parent: Optional[winreg.HKEYType] = None
+                          ) -> Tuple[bool, List[str], List[str]]:
+        """
+        Блокирует все указанные исполняемые файлы одной транзакцией.
+        
+        Ключи IFEO создаются и фиксируются одним коммитом.
+        Возвращает (успех, сообщения, заблокированные файлы).
+        Выбрасывает OSError, если транзакции реестра недоступны.
+        """
         messages = []
         all_success = True
+        blocked = []
+        access = cls._get_registry_access(write=True)
         
-        for exe in executables:
-            success, msg = cls.block_executable(exe)
-            messages.append(msg)
-            if not success:
-                all_success = False
+        with _RegistryTransaction() as transaction:
+            for exe in executables:
+                if not cls._validate_exe_name(exe):
+                    messages.append(f"Недопустимое имя: {exe}")
+                    all_success = False
+                    continue
+                
+                try:
+                    root, key_path = _ifeo_key_location(exe, parent)
+                    key = transaction.create_key(int(root), key_path, access)
+                    try:
+                        transaction.set_string(key, "Debugger", cls.BLOCKER_CMD)
+                    finally:
+                        transaction.close_key(key)
+                    blocked.append(exe)
+                    messages.append(f"Заблокирован: {exe}")
+                except PermissionError:
+                    msg = f"Нет прав администратора для блокировки: {exe}"
+                    logger.error("❌ %s", msg)
+                    messages.append(msg)
+                    all_success = False
+                except OSError as e:
+                    msg = f"Ошибка блокировки {exe}: {e}"
+                    logger.error("❌ %s", msg)
+                    messages.append(msg)
+                    all_success = False
+            
+            transaction.commit()
+        
+        for exe in blocked:
+            cls.invalidate_cache(exe)
+            logger.info("✅ Заблокирован: %s", exe)
+        
+        return all_success, messages, blocked
+    
+    @classmethod
+    def block_all(cls, executables: List[str]) -> Tuple[bool, List[str], Dict[str, bool]]:
+        """
+        Блокирует все указанные исполняемые файлы.
         
-        return all_success, messages
+        Возвращает (успех, сообщения, статус блокировки после операции).
+        """
+        parent = cls._open_ifeo_or_none(write=True)
+        try:
+            try:
+                all_success, messages, blocked = cls.block_all_batched(executables, parent)
+            except OSError as e:
+                logger.warning("Транзакция реестра недоступна, блокировка по одному: %s", e)
+                
+                messages = []
+                all_success = True
+                blocked = []
+                
+                for exe in executables:
+                    success, msg = cls.block_executable(exe, parent)
+                    messages.append(msg)
+                    if success:
+                        blocked.append(exe)
+                    else:
+                        all_success = False
+            
+            return (all_success, messages,
+                    cls._status_after_write(executables, blocked, True, parent))
+        finally:
+            if parent is not None:
+                winreg.CloseKey(parent)
     
     @classmethod
-    def unblock_all(cls, executables: List[str]) -> Tuple[bool, List[str]]:
-        """Разблокирует все указанные исполняемые файлы"""
+    def unblock_all_batched(cls, executables: List[str],
+                            parent: Optional[winreg.HKEYType] = None
+                            ) -> Tuple[bool, List[str], List[str]]:
+        """
+        Разблокирует все указанные исполняемые файлы одной транзакцией.
+        
+        Одной транзакцией удаляются ключи IFEO, в которых есть только наш
+        Debugger. Ключи с другими значениями или подключами, ключи, которые
+        не удалось прочитать или удалить, разблокируются по одному через
+        unblock_executable. Ключи без нашего Debugger не трогаются.
+        Возвращает (успех, сообщения, разблокированные файлы).
+        Выбрасывает OSError, если транзакции реестра недоступны.
+        """
+        results: Dict[str, Tuple[bool, str]] = {}
+        deleted = []
+        fallback = []
+        read_access = cls._get_registry_access(write=False)
+        view = read_access & winreg.KEY_WOW64_64KEY
+        
+        with _RegistryTransaction() as transaction:
+            for exe in executables:
+                if not cls._validate_exe_name(exe):
+                    results[exe] = (False, f"Недопустимое имя: {exe}")
+                    continue
+                
+                try:
+                    debugger, subkey_count, value_count = _RawRegistry.query_key_info(
+                        exe, read_access, parent
+                    )
+                except OSError as e:
+                    # Не смогли прочитать ключ - пусть unblock_executable сообщит причину
+                    logger.debug("Ошибка чтения IFEO %s: %s", exe, e)
+                    fallback.append(exe)
+                    continue
+                
+                if debugger != cls.BLOCKER_CMD:
+                    # Не заблокирован нами - ключ (если есть) оставляем как есть
+                    results[exe] = (True, f"Разблокирован: {exe}")
+                    continue
+                
+                if subkey_count or value_count != 1:
+                    # Кроме нашего Debugger в ключе есть чужие настройки
+                    # (например, MitigationOptions) - удаляем только значение
+                    fallback.append(exe)
+                    continue
+                
+                try:
+                    root, key_path = _ifeo_key_location(exe, parent)
+                    transaction.delete_key(int(root), key_path, view)
+                except FileNotFoundError:
+                    pass  # Ключа уже нет
+                except OSError as e:
+                    # Например, у ключа появились подключи - удаляем только значение
+                    logger.debug("Не удалось удалить ключ IFEO %s: %s", exe, e)
+                    fallback.append(exe)
+                    continue
+                deleted.append(exe)
+                results[exe] = (True, f"Разблокирован: {exe}")
+            
+            transaction.commit()
+        
+        for exe in deleted:
+            cls.invalidate_cache(exe)
+            logger.info("✅ Разблокирован: %s", exe)
+        
+        for exe in fallback:
+            results[exe] = cls.unblock_executable(exe, parent)
+        
         messages = []
         all_success = True
-        
+        unblocked = []
         for exe in executables:
-            success, msg = cls.unblock_executable(exe)
+            success, msg = results[exe]
             messages.append(msg)
-            if not success:
+            if success:
+                unblocked.append(exe)
+            else:
                 all_success = False
         
-        return all_success, messages
+        return all_success, messages, unblocked
+    
+    @classmethod
+    def unblock_all(cls, executables: List[str]) -> Tuple[bool, List[str], Dict[str, bool]]:
+        """
+        Разблокирует все указанные исполняемые файлы.
+        
+        Возвращает (успех, сообщения, статус блокировки после операции).
+        """
+        parent = cls._open_ifeo_or_none(write=True)
+        try:
+            try:
+                all_success, messages, unblocked = cls.unblock_all_batched(executables, parent)
+                return (all_success, messages,
+                        cls._status_after_write(executables, unblocked, False, parent))
+            except OSError as e:
+                logger.warning("Транзакция реестра недоступна, разблокировка по одному: %s", e)
+            
+            messages = []
+            all_success = True
+            unblocked = []
+            
+            for exe in executables:
+                success, msg = cls.unblock_executable(exe, parent)
+                messages.append(msg)
+                if success:
+                    unblocked.append(exe)
+                else:
+                    all_success = False
+            
+            return (all_success, messages,
+                    cls._status_after_write(executables, unblocked, False, parent))
+        finally:
+            if parent is not None:
+                winreg.CloseKey(parent)
+    
+    @classmethod
+    def _status_after_write(cls, executables: List[str], changed: List[str], blocked: bool,
+                            parent: Optional[winreg.HKEYType] = None) -> Dict[str, bool]:
+        """
+        Собирает статус после блокировки или разблокировки.
+        
+        Для изменённых файлов статус известен и сразу попадает в кэш,
+        из реестра читаются только файлы, которые изменить не удалось.
+        """
+        changed = set(changed)
+        status = {}
+        for exe in executables:
+            if exe in changed:
+                cls._status_cache[exe.lower()] = blocked
+                status[exe] = blocked
+            else:
+                blocked_now = cls._is_blocked_uncached(exe, parent)
+                cls._status_cache[exe.lower()] = blocked_now
+                status[exe] = blocked_now
+        return status
     
     @classmethod
     def get_status(cls, executables: List[str]) -> Dict[str, bool]:
         """Возвращает статус блокировки для всех исполняемых файлов"""
-        return {exe: cls.is_blocked(exe) for exe in executables}
+        parent = cls._open_ifeo_or_none(write=False)
+        try:
+            return {exe: cls.is_blocked(exe, parent) for exe in executables}
+        finally:
+            if parent is not None:
+                winreg.CloseKey(parent)
+    
+    @classmethod
+    def get_status_fast(cls, executables: List[str]) -> Dict[str, bool]:
+        """
+        Возвращает статус блокировки, перечисляя подключи IFEO один раз.
+        
+        Значение Debugger читается только для файлов, у которых есть ключ в IFEO.
+        Если перечисление прервалось ошибкой или список кончился раньше,
+        остальные файлы проверяются по одному.
+        """
+        try:
+            parent = cls._open_ifeo(write=False)
+        except OSError as e:
+            logger.debug("Не удалось открыть IFEO, проверка по одному: %s", e)
+            return {exe: cls.is_blocked(exe) for exe in executables}
+        
+        try:
+            present = set()
+            complete = True
+            try:
+                subkey_count = winreg.QueryInfoKey(parent)[0]
+                for index in range(subkey_count):
+                    present.add(winreg.EnumKey(parent, index).lower())
+            except OSError as e:
+                # Список кончился раньше: подключи удалили во время перечисления,
+                # индексы сдвинулись, и существующий ключ мог быть пропущен
+                if getattr(e, 'winerror', None) != ERROR_NO_MORE_ITEMS:
+                    logger.debug("Ошибка перечисления IFEO: %s", e)
+                complete = False
+            
+            status = {}
+            for exe in executables:
+                if exe.lower() in present or not complete:
+                    status[exe] = cls.is_blocked(exe, parent)
+                else:
+                    cls._status_cache[exe.lower()] = False
+                    status[exe] = False
+            return status
+        finally:
+            winreg.CloseKey(parent)
     
     @classmethod
     def is_any_blocked(cls, executables: List[str]) -> bool:
@@ -296,10 +961,121 @@ class RegistryBlocker:
         return sum(1 for exe in executables if cls.is_blocked(exe))
 
 
+class IfeoWatcher:
+    """
+    Следит за изменениями в IFEO через RegNotifyChangeKeyValue.
+    
+    Фоновый поток ждёт в ядре, пока ключ не изменится, и вызывает on_change
+    (в этом же фоновом потоке). stop() будит поток через отдельное событие,
+    которое закрывается, когда поток завершается.
+    """
+    
+    _advapi32 = None
+    
+    def __init__(self, on_change: Callable[[], None]):
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        # Событие остановки с ручным сбросом: после stop() остаётся установленным
+        self._stop_event = _load_kernel32().CreateEventW(None, True, False, None)
+        if not self._stop_event:
+            raise ctypes.WinError(ctypes.get_last_error())
+    
+    @classmethod
+    def _load_advapi32(cls):
+        """Загружает функцию подписки на изменения реестра"""
+        if cls._advapi32 is not None:
+            return cls._advapi32
+        
+        advapi32 = ctypes.WinDLL('advapi32', use_last_error=True)
+        
+        advapi32.RegNotifyChangeKeyValue.argtypes = [
+            wintypes.HKEY, wintypes.BOOL, wintypes.DWORD, wintypes.HANDLE, wintypes.BOOL,
+        ]
+        advapi32.RegNotifyChangeKeyValue.restype = wintypes.LONG
+        
+        cls._advapi32 = advapi32
+        return advapi32
+    
+    def start(self):
+        """Запускает наблюдение в фоновом потоке"""
+        threading.Thread(target=self._run, daemon=True).start()
+    
+    def stop(self):
+        """Останавливает наблюдение"""
+        with self._lock:
+            if self._stop_event:
+                _load_kernel32().SetEvent(self._stop_event)
+    
+    def _run(self):
+        """Тело фонового потока: наблюдение, затем закрытие события остановки"""
+        try:
+            self._watch()
+        finally:
+            with self._lock:
+                _load_kernel32().CloseHandle(self._stop_event)
+                self._stop_event = None
+    
+    def _watch(self):
+        """Цикл ожидания изменений"""
+        kernel32 = _load_kernel32()
+        advapi32 = self._load_advapi32()
+        
+        try:
+            parent = RegistryBlocker._open_ifeo(write=False)
+        except OSError as e:
+            logger.debug("Наблюдение за IFEO недоступно: %s", e)
+            return
+        
+        change_event = kernel32.CreateEventW(None, False, False, None)
+        handles = (wintypes.HANDLE * 2)(change_event, self._stop_event)
+        
+        try:
+            while change_event:
+                # Регистрация одноразовая - повторяем её после каждого срабатывания
+                status = advapi32.RegNotifyChangeKeyValue(
+                    int(parent), True,
+                    REG_NOTIFY_CHANGE_NAME | REG_NOTIFY_CHANGE_LAST_SET,
+                    change_event, True
+                )
+                if status != ERROR_SUCCESS:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Ошибка подписки на изменения IFEO: %s", ctypes.WinError(status))
+                    break
+                
+                if kernel32.WaitForMultipleObjects(2, handles, False, INFINITE) != WAIT_OBJECT_0:
+                    break  # Остановка или ошибка ожидания
+                
+                self._on_change()
+        finally:
+            winreg.CloseKey(parent)
+            if change_event:
+                kernel32.CloseHandle(change_event)
+
+
 class ProcessKiller:
     """Убивает уже запущенные процессы Яндекс Браузера"""
     
-    YANDEX_INDICATORS = ("yandex", "yabrowser", "yandexbrowser")
+    @classmethod
+    def _iter_processes_fast(cls) -> Iterator[Tuple[int, str]]:
+        """
+        Перечисляет процессы одним снимком Toolhelp.
+        
+        Возвращает пары (PID, имя файла в нижнем регистре).
+        """
+        kernel32 = _load_kernel32()
+        snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+        if not snapshot or snapshot == INVALID_HANDLE_VALUE:
+            raise ctypes.WinError(ctypes.get_last_error())
+        
+        try:
+            entry = PROCESSENTRY32W()
+            entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+            has_entry = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+            while has_entry:
+                yield entry.th32ProcessID, entry.szExeFile.lower()
+                has_entry = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+        finally:
+            kernel32.CloseHandle(snapshot)
     
     @classmethod
     def kill_all_yandex(cls) -> List[str]:
@@ -307,64 +1083,114 @@ class ProcessKiller:
         killed = []
         
         try:
-            import psutil
-        except ImportError:
-            # Если psutil недоступен, используем taskkill
+            # Кроме блокируемых файлов берём любые процессы с "yandex" в имени
+            # (обновлятор, помощники) - для этого не нужно открывать процесс
+            candidates = [
+                (pid, name) for pid, name in cls._iter_processes_fast()
+                if name in _BLOCKED_EXE_SET or cls._has_yandex_indicator(name)
+            ]
+        except OSError as e:
+            # Если снимок процессов недоступен, используем taskkill
+            logger.debug("Ошибка снимка процессов: %s", e)
             return cls._kill_with_taskkill()
         
-        for proc in psutil.process_iter(['pid', 'name', 'exe', 'cmdline']):
+        for pid, name in candidates:
             try:
-                proc_info = proc.info
-                if cls._is_yandex_browser(proc_info):
-                    proc.kill()
-                    name = proc_info.get('name', 'Unknown')
+                if cls._kill_process(pid, name):
                     killed.append(name)
-                    logger.info(f"Завершён процесс: {name} (PID: {proc_info.get('pid')})")
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
+                    logger.info("Завершён процесс: %s (PID: %s)", name, pid)
             except Exception as e:
-                logger.debug(f"Ошибка при завершении процесса: {e}")
+                logger.debug("Ошибка при завершении процесса: %s", e)
         
         return killed
     
     @classmethod
-    def _is_yandex_browser(cls, proc_info: dict) -> bool:
-        """Проверяет, является ли процесс Яндекс Браузером"""
-        name = (proc_info.get('name') or '').lower()
-        exe = (proc_info.get('exe') or '').lower()
-        cmdline = proc_info.get('cmdline') or []
+    def _kill_process(cls, pid: int, name: str) -> bool:
+        """Завершает процесс, если он принадлежит Яндекс Браузеру"""
+        kernel32 = _load_kernel32()
+        handle = kernel32.OpenProcess(
+            PROCESS_TERMINATE | PROCESS_QUERY_LIMITED_INFORMATION, False, pid
+        )
+        if not handle:
+            return False  # Процесс уже завершён или нет доступа
+        
+        try:
+            if not cls._is_yandex_browser(handle, pid, name):
+                return False
+            return bool(kernel32.TerminateProcess(handle, 1))
+        finally:
+            kernel32.CloseHandle(handle)
+    
+    @classmethod
+    def _query_image_path(cls, handle: int) -> str:
+        """Возвращает полный путь к исполняемому файлу процесса"""
+        buffer = ctypes.create_unicode_buffer(MAX_PATH)
+        size = wintypes.DWORD(MAX_PATH)
+        if _load_kernel32().QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+            return buffer.value
+        return ''
+    
+    @classmethod
+    def _is_yandex_browser(cls, handle: int, pid: int, name: str) -> bool:
+        """
+        Проверяет, является ли процесс Яндекс Браузером.
+        
+        name - имя процесса в нижнем регистре. Путь к файлу и командная
+        строка запрашиваются у процесса, только если имени недостаточно.
+        """
+        if name in _YANDEX_NAMES or cls._has_yandex_indicator(name):
+            return True
+        if name not in _BLOCKED_EXE_SET:
+            return False
         
         # Проверяем путь к исполняемому файлу
-        for indicator in cls.YANDEX_INDICATORS:
-            if indicator in exe:
-                return True
+        if cls._has_yandex_indicator(cls._query_image_path(handle).lower()):
+            return True
         
-        # Для browser.exe проверяем командную строку
-        if name == 'browser.exe':
-            cmdline_str = ' '.join(cmdline).lower()
-            for indicator in cls.YANDEX_INDICATORS:
-                if indicator in cmdline_str:
-                    return True
+        # Для browser.exe проверяем командную строку (нужен psutil)
+        if name == 'browser.exe' and psutil is not None:
+            try:
+                cmdline = psutil.Process(pid).cmdline() or []
+            except psutil.Error:
+                cmdline = []
+            if cls._has_yandex_indicator(' '.join(cmdline).lower()):
+                return True
         
         return False
     
+    @staticmethod
+    def _has_yandex_indicator(text: str) -> bool:
+        """Ищет в строке признаки Яндекса: yandex, yabrowser, yandexbrowser"""
+        # Все признаки начинаются с "ya", поэтому короткий поиск отсекает
+        # почти все строки за один проход. "yandexbrowser" покрывается "yandex"
+        return 'ya' in text and ('yandex' in text or 'yabrowser' in text)
+    
     @classmethod
     def _kill_with_taskkill(cls) -> List[str]:
-        """Fallback: завершение через taskkill"""
+        """Fallback: завершение через taskkill (один вызов на все файлы)"""
         killed = []
         
-        for exe_name in BLOCKED_EXECUTABLES:
-            try:
-                result = subprocess.run(
-                    ['taskkill', '/F', '/IM', exe_name],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    killed.append(exe_name)
-                    logger.info(f"Завершён через taskkill: {exe_name}")
-            except Exception as e:
-                logger.debug(f"Ошибка taskkill для {exe_name}: {e}")
+        try:
+            result = subprocess.run(
+                _TASKKILL_ARGS,
+                capture_output=True,
+                text=True,
+                errors='replace',
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+        except Exception as e:
+            logger.debug("Ошибка taskkill: %s", e)
+            return killed
+        
+        # Успешные завершения выводятся в stdout, по строке на процесс:
+        # SUCCESS: The process "browser.exe" with PID 1234 has been terminated.
+        # Текст локализован, поэтому берём только имя процесса в кавычках
+        for line in result.stdout.splitlines():
+            match = _TASKKILL_NAME_RE.search(line)
+            if match and match.group(1).lower() in _BLOCKED_EXE_SET:
+                name = match.group(1)
+                killed.append(name)
+                logger.info("Завершён через taskkill: %s", name)
         
         return killed
 
@@ -372,213 +1198,319 @@ class ProcessKiller:
 class YandexBlockerApp:
     """Главное приложение блокировщика"""
     
+    # Размер окна фиксирован, под него рассчитана раскладка виджетов
+    WINDOW_WIDTH = 500
+    WINDOW_HEIGHT = 550
+    
+    # Оформление статуса: заливка, обводка, текст, состояния кнопок
+    STATUS_STYLES = {
+        # Полная блокировка
+        'all': ("#dc3545", "#c82333", "🔴 ЗАБЛОКИРОВАН", tk.DISABLED, tk.NORMAL),
+        # Частичная блокировка
+        'partial': ("#ffc107", "#e0a800", "🟡 ЧАСТИЧНО", tk.NORMAL, tk.NORMAL),
+        # Не заблокирован
+        'none': ("#6c757d", "#545b62", "⚪ НЕ ЗАБЛОКИРОВАН", tk.NORMAL, tk.DISABLED),
+    }
+    
     def __init__(self):
         self.config = AppConfig.load()
+        self._busy = False
+        self._refresh_pending = False
+        self._writing_ifeo = False
+        self._button_states = (tk.NORMAL, tk.NORMAL)
+        # Фоновые потоки не трогают Tk: они кладут сюда функции для потока Tk
+        self._ui_calls: 'queue.Queue[Callable[[], None]]' = queue.Queue()
         self.root = tk.Tk()
+        self.root.bind('<<UiCall>>', self._drain_ui_calls)
         self._setup_window()
         self._create_widgets()
         self._update_status()
+        self._start_watcher()
     
     def _setup_window(self):
         """Настройка главного окна"""
         self.root.title("🛡️ Блокировщик Яндекс Браузера")
-        self.root.geometry("500x550")
+        self.root.geometry(f"{self.WINDOW_WIDTH}x{self.WINDOW_HEIGHT}")
         self.root.resizable(False, False)
         
         # Центрирование окна
         self.root.update_idletasks()
-        x = (self.root.winfo_screenwidth() - 500) // 2
-        y = (self.root.winfo_screenheight() - 550) // 2
+        x = (self.root.winfo_screenwidth() - self.WINDOW_WIDTH) // 2
+        y = (self.root.winfo_screenheight() - self.WINDOW_HEIGHT) // 2
         self.root.geometry(f"+{x}+{y}")
         
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
     
     def _create_widgets(self):
-        """Создание виджетов интерфейса"""
-        main_frame = ttk.Frame(self.root, padding="20")
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        """
+        Создание виджетов интерфейса.
+        
+        Окно фиксированного размера, поэтому координаты заданы заранее:
+        статичный текст рисуется на фоновом холсте, а виджеты ставятся через place.
+        """
+        width = self.WINDOW_WIDTH
+        center = width // 2
+        
+        self.canvas = tk.Canvas(
+            self.root,
+            width=width,
+            height=self.WINDOW_HEIGHT,
+            background=self.root.cget("background"),
+            highlightthickness=0
+        )
+        self.canvas.place(x=0, y=0)
+        canvas = self.canvas
         
         # Заголовок
-        ttk.Label(
-            main_frame,
+        canvas.create_text(
+            center, 30,
             text="🛡️ Блокировщик Яндекс Браузера",
             font=("Segoe UI", 18, "bold")
-        ).pack(pady=(0, 5))
-        
-        ttk.Label(
-            main_frame,
+        )
+        canvas.create_text(
+            center, 58,
             text=f"Версия {__version__} • Моментальная блокировка через реестр",
             font=("Segoe UI", 9),
-            foreground="gray"
-        ).pack(pady=(0, 15))
+            fill="gray"
+        )
         
         # Статус администратора
         if is_admin():
-            admin_frame = ttk.Frame(main_frame)
-            admin_frame.pack(fill=tk.X, pady=5)
-            ttk.Label(
-                admin_frame,
-                text="✅ Права администратора получены",
-                font=("Segoe UI", 10, "bold"),
-                foreground="green"
-            ).pack()
+            admin_text, admin_color = "✅ Права администратора получены", "green"
         else:
-            admin_frame = ttk.Frame(main_frame)
-            admin_frame.pack(fill=tk.X, pady=5)
-            ttk.Label(
-                admin_frame,
-                text="❌ Требуются права администратора!",
-                font=("Segoe UI", 10, "bold"),
-                foreground="red"
-            ).pack()
+            admin_text, admin_color = "❌ Требуются права администратора!", "red"
+        canvas.create_text(
+            center, 84,
+            text=admin_text,
+            font=("Segoe UI", 10, "bold"),
+            fill=admin_color
+        )
         
         # Разделитель
-        ttk.Separator(main_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=15)
-        
-        # Статус блокировки
-        status_frame = ttk.LabelFrame(main_frame, text="📊 Статус блокировки", padding="15")
-        status_frame.pack(fill=tk.X, pady=10)
+        canvas.create_line(20, 104, width - 20, 104, fill="#c0c0c0")
         
-        # Индикатор
-        indicator_frame = ttk.Frame(status_frame)
-        indicator_frame.pack(pady=10)
-        
-        self.indicator = tk.Canvas(indicator_frame, width=80, height=80, highlightthickness=0)
-        self.indicator.pack()
-        self.indicator_circle = self.indicator.create_oval(
-            10, 10, 70, 70, fill="gray", outline="darkgray", width=3
+        # Статус блокировки: индикатор и подписи рисуются на том же холсте
+        canvas.create_text(
+            20, 120,
+            text="📊 Статус блокировки",
+            font=("Segoe UI", 10),
+            anchor=tk.W
         )
         
-        self.status_var = tk.StringVar(value="Проверка...")
-        self.status_label = ttk.Label(
-            status_frame,
-            textvariable=self.status_var,
+        self.indicator_circle = canvas.create_oval(
+            center - 30, 134, center + 30, 194, fill="gray", outline="darkgray", width=3
+        )
+        self.status_text = canvas.create_text(
+            center, 214,
+            text="Проверка...",
             font=("Segoe UI", 14, "bold")
         )
-        self.status_label.pack(pady=5)
-        
-        self.blocked_count_var = tk.StringVar(value="")
-        ttk.Label(
-            status_frame,
-            textvariable=self.blocked_count_var,
+        self.blocked_count_text = canvas.create_text(
+            center, 238,
+            text="",
             font=("Segoe UI", 10),
-            foreground="gray"
-        ).pack()
+            fill="gray"
+        )
         
         # Кнопки управления
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(pady=20)
-        
         self.block_button = tk.Button(
-            button_frame,
+            self.root,
             text="🔒 ЗАБЛОКИРОВАТЬ",
             font=("Segoe UI", 12, "bold"),
             bg="#dc3545",
             fg="white",
-            width=18,
-            height=2,
             cursor="hand2",
             command=self._on_block
         )
-        self.block_button.pack(side=tk.LEFT, padx=10)
+        self.block_button.place(x=30, y=258, width=210, height=52)
         
         self.unblock_button = tk.Button(
-            button_frame,
+            self.root,
             text="🔓 РАЗБЛОКИРОВАТЬ",
             font=("Segoe UI", 12, "bold"),
             bg="#28a745",
             fg="white",
-            width=18,
-            height=2,
             cursor="hand2",
             command=self._on_unblock
         )
-        self.unblock_button.pack(side=tk.LEFT, padx=10)
+        self.unblock_button.place(x=260, y=258, width=210, height=52)
         
         # Дополнительные действия
-        extra_frame = ttk.Frame(main_frame)
-        extra_frame.pack(pady=10)
-        
-        ttk.Button(
-            extra_frame,
+        self.kill_button = ttk.Button(
+            self.root,
             text="💀 Завершить все процессы Яндекса",
             command=self._on_kill_processes
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        self.kill_button.place(x=30, y=322, width=260, height=30)
         
-        ttk.Button(
-            extra_frame,
+        self.refresh_button = ttk.Button(
+            self.root,
             text="🔄 Обновить статус",
-            command=self._update_status
-        ).pack(side=tk.LEFT, padx=5)
-        
-        # Список блокируемых файлов
-        files_frame = ttk.LabelFrame(main_frame, text="📁 Блокируемые файлы", padding="10")
-        files_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+            command=lambda: self._update_status(force_refresh=True)
+        )
+        self.refresh_button.place(x=300, y=322, width=170, height=30)
         
-        # Создаём список с прокруткой
-        list_frame = ttk.Frame(files_frame)
-        list_frame.pack(fill=tk.BOTH, expand=True)
+        # Список блокируемых файлов с прокруткой
+        canvas.create_text(
+            20, 370,
+            text="📁 Блокируемые файлы",
+            font=("Segoe UI", 10),
+            anchor=tk.W
+        )
         
-        scrollbar = ttk.Scrollbar(list_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        scrollbar = ttk.Scrollbar(self.root)
+        scrollbar.place(x=width - 37, y=382, width=17, height=112)
         
         self.files_listbox = tk.Listbox(
-            list_frame,
+            self.root,
             font=("Consolas", 10),
-            height=6,
             yscrollcommand=scrollbar.set
         )
-        self.files_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.files_listbox.place(x=20, y=382, width=width - 57, height=112)
         scrollbar.config(command=self.files_listbox.yview)
         
         # Информация
-        ttk.Label(
-            main_frame,
+        canvas.create_text(
+            center, 522,
             text="ℹ️ Блокировка работает через реестр Windows (IFEO).\n"
                  "Браузер не сможет запуститься вообще — это моментальная блокировка.",
             font=("Segoe UI", 9),
-            foreground="gray",
+            fill="gray",
             justify=tk.CENTER
-        ).pack(pady=10)
+        )
     
-    def _update_status(self):
-        """Обновляет статус блокировки в интерфейсе"""
-        executables = self.config.blocked_executables
-        status = RegistryBlocker.get_status(executables)
+    def _run_in_background(self, worker: Callable[[], object], on_done: Callable[[object], None],
+                           writes_ifeo: bool = False):
+        """
+        Выполняет worker в фоновом потоке, а on_done(результат) - в потоке Tk.
+        
+        Пока работа идёт, кнопки управления отключены.
+        writes_ifeo означает, что worker сам пишет в IFEO и возвращает статус.
+        """
+        if self._busy:
+            return
+        self._set_busy(True)
+        self._writing_ifeo = writes_ifeo
+        
+        def run():
+            try:
+                result = worker()
+            except Exception as e:
+                logger.error("Ошибка фоновой операции: %s", e)
+                self._post_ui_call(functools.partial(self._fail_background, e))
+            else:
+                self._post_ui_call(functools.partial(self._finish_background, on_done, result))
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _post_ui_call(self, call: Callable[[], None]):
+        """Передаёт функцию в поток Tk и будит его виртуальным событием"""
+        self._ui_calls.put(call)
+        try:
+            self.root.event_generate('<<UiCall>>', when='tail')
+        except (tk.TclError, RuntimeError) as e:
+            logger.debug("Окно уже закрыто: %s", e)
+    
+    def _drain_ui_calls(self, event=None):
+        """Выполняет в потоке Tk функции, переданные фоновыми потоками"""
+        while True:
+            try:
+                call = self._ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            call()
+    
+    def _finish_background(self, on_done: Callable[[object], None], result: object):
+        """Завершает фоновую операцию в потоке Tk"""
+        self._set_busy(False)
+        on_done(result)
+    
+    def _fail_background(self, error: Exception):
+        """Сообщает об ошибке фоновой операции"""
+        self._set_busy(False)
+        messagebox.showerror(
+            "Ошибка",
+            f"Операция не выполнена:\n\n{error}"
+        )
+    
+    def _set_busy(self, busy: bool):
+        """Отключает кнопки на время фоновой операции"""
+        self._busy = busy
+        if not busy:
+            self._writing_ifeo = False
+        state = tk.DISABLED if busy else tk.NORMAL
+        self.kill_button.config(state=state)
+        self.refresh_button.config(state=state)
+        
+        # После операции кнопки блокировки возвращаются в состояние по статусу
+        block_state, unblock_state = (tk.DISABLED, tk.DISABLED) if busy else self._button_states
+        self.block_button.config(state=block_state)
+        self.unblock_button.config(state=unblock_state)
+        
+        # Изменения IFEO, пришедшие во время операции, - одно обновление после неё
+        if not busy and self._refresh_pending:
+            self._refresh_pending = False
+            self._post_ui_call(lambda: self._update_status(force_refresh=True))
+    
+    def _update_status(self, force_refresh: bool = False):
+        """
+        Обновляет статус блокировки в интерфейсе.
+        
+        При force_refresh статус перечитывается из реестра, минуя кэш.
+        Если идёт другая операция, обновление откладывается до её окончания.
+        """
+        if self._busy:
+            self._refresh_pending = True
+            return
+        self._run_in_background(
+            lambda: self._read_status(force_refresh),
+            self._render_status
+        )
+    
+    def _read_status(self, force_refresh: bool = False) -> Dict[str, bool]:
+        """
+        Читает статус блокировки из реестра (выполняется в фоновом потоке).
+        
+        Единственное место в интерфейсе, которое обращается к реестру за статусом.
+        """
+        if force_refresh:
+            RegistryBlocker.invalidate_cache()
+        return RegistryBlocker.get_status_fast(self.config.blocked_executables)
+    
+    def _render_status(self, status: Dict[str, bool]):
+        """Отображает статус блокировки в интерфейсе (без обращений к реестру)"""
         blocked_count = sum(1 for v in status.values() if v)
-        total_count = len(executables)
+        total_count = len(status)
         
-        # Обновляем список файлов
+        # Обновляем список файлов одним вызовом Tcl
+        items = [
+            f"  {'🔒' if is_blocked else '🔓'}  {exe} — "
+            f"{'ЗАБЛОКИРОВАН' if is_blocked else 'не заблокирован'}"
+            for exe, is_blocked in status.items()
+        ]
         self.files_listbox.delete(0, tk.END)
-        for exe, is_blocked in status.items():
-            icon = "🔒" if is_blocked else "🔓"
-            state = "ЗАБЛОКИРОВАН" if is_blocked else "не заблокирован"
-            self.files_listbox.insert(tk.END, f"  {icon}  {exe} — {state}")
+        if items:
+            self.files_listbox.insert(tk.END, *items)
         
         # Обновляем индикатор и статус
         if blocked_count == total_count:
-            # Полная блокировка
-            self.indicator.itemconfig(self.indicator_circle, fill="#dc3545", outline="#c82333")
-            self.status_var.set("🔴 ЗАБЛОКИРОВАН")
-            self.status_label.configure(foreground="#dc3545")
-            self.block_button.config(state=tk.DISABLED)
-            self.unblock_button.config(state=tk.NORMAL)
+            state = 'all'
         elif blocked_count > 0:
-            # Частичная блокировка
-            self.indicator.itemconfig(self.indicator_circle, fill="#ffc107", outline="#e0a800")
-            self.status_var.set("🟡 ЧАСТИЧНО")
-            self.status_label.configure(foreground="#ffc107")
-            self.block_button.config(state=tk.NORMAL)
-            self.unblock_button.config(state=tk.NORMAL)
+            state = 'partial'
         else:
-            # Не заблокирован
-            self.indicator.itemconfig(self.indicator_circle, fill="#6c757d", outline="#545b62")
-            self.status_var.set("⚪ НЕ ЗАБЛОКИРОВАН")
-            self.status_label.configure(foreground="#6c757d")
-            self.block_button.config(state=tk.NORMAL)
-            self.unblock_button.config(state=tk.DISABLED)
+            state = 'none'
+        fill, outline, text, block_state, unblock_state = self.STATUS_STYLES[state]
+        
+        self.canvas.itemconfig(self.indicator_circle, fill=fill, outline=outline)
+        self.canvas.itemconfig(self.status_text, text=text, fill=fill)
+        self._button_states = (block_state, unblock_state)
+        self.block_button.config(state=block_state)
+        self.unblock_button.config(state=unblock_state)
         
-        self.blocked_count_var.set(f"Заблокировано: {blocked_count} из {total_count}")
+        self.canvas.itemconfig(
+            self.blocked_count_text,
+            text=f"Заблокировано: {blocked_count} из {total_count}"
+        )
     
     def _on_block(self):
         """Обработчик кнопки блокировки"""
@@ -590,13 +1522,21 @@ class YandexBlockerApp:
             )
             return
         
+        self._run_in_background(self._do_block, self._finish_block, writes_ifeo=True)
+    
+    def _do_block(self) -> Tuple[bool, List[str], List[str], Dict[str, bool]]:
+        """Завершает процессы и блокирует файлы (выполняется в фоновом потоке)"""
         # Сначала завершаем все процессы
         killed = ProcessKiller.kill_all_yandex()
         
         # Затем блокируем в реестре
-        success, messages = RegistryBlocker.block_all(self.config.blocked_executables)
-        
-        self._update_status()
+        success, messages, status = RegistryBlocker.block_all(self.config.blocked_executables)
+        return success, messages, killed, status
+    
+    def _finish_block(self, result: Tuple[bool, List[str], List[str], Dict[str, bool]]):
+        """Показывает результат блокировки"""
+        success, messages, killed, status = result
+        self._render_status(status)
         
         # Показываем результат
         result_text = "\n".join(f"• {m}" for m in messages)
@@ -625,9 +1565,16 @@ class YandexBlockerApp:
             )
             return
         
-        success, messages = RegistryBlocker.unblock_all(self.config.blocked_executables)
-        
-        self._update_status()
+        self._run_in_background(self._do_unblock, self._finish_unblock, writes_ifeo=True)
+    
+    def _do_unblock(self) -> Tuple[bool, List[str], Dict[str, bool]]:
+        """Разблокирует файлы (выполняется в фоновом потоке)"""
+        return RegistryBlocker.unblock_all(self.config.blocked_executables)
+    
+    def _finish_unblock(self, result: Tuple[bool, List[str], Dict[str, bool]]):
+        """Показывает результат разблокировки"""
+        success, messages, status = result
+        self._render_status(status)
         
         result_text = "\n".join(f"• {m}" for m in messages)
         
@@ -645,8 +1592,10 @@ class YandexBlockerApp:
     
     def _on_kill_processes(self):
         """Завершает все процессы Яндекс Браузера"""
-        killed = ProcessKiller.kill_all_yandex()
-        
+        self._run_in_background(ProcessKiller.kill_all_yandex, self._finish_kill_processes)
+    
+    def _finish_kill_processes(self, killed: List[str]):
+        """Показывает результат завершения процессов"""
         if killed:
             messagebox.showinfo(
                 "💀 Процессы завершены",
@@ -660,8 +1609,32 @@ class YandexBlockerApp:
                 "Процессы Яндекс Браузера не найдены."
             )
     
+    def _start_watcher(self):
+        """Включает автоматическое обновление статуса при изменениях в IFEO"""
+        self._watcher = None
+        try:
+            self._watcher = IfeoWatcher(self._post_ifeo_changed)
+        except OSError as e:
+            logger.debug("Наблюдение за IFEO недоступно: %s", e)
+            return
+        self._watcher.start()
+    
+    def _post_ifeo_changed(self):
+        """Передаёт уведомление об изменении IFEO в поток Tk"""
+        self._post_ui_call(self._on_ifeo_changed)
+    
+    def _on_ifeo_changed(self):
+        """Перечитывает статус после изменения IFEO"""
+        if self._writing_ifeo:
+            # Изменение вызвано нашей же записью: статус отрисуется по её результату
+            return
+        # Если идёт операция, она могла уже прочитать реестр - обновление будет после неё
+        self._update_status(force_refresh=True)
+    
     def _on_close(self):
         """Обработчик закрытия окна"""
+        if self._watcher is not None:
+            self._watcher.stop()
         self.root.destroy()
     
     def run(self):
@@ -698,4 +1671,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file